@@ -0,0 +1,63 @@
+"""Build the optional compiled core used by ``tax_calculator.yearly_salary_details``.
+
+    python setup.py build_ext --inplace
+
+Without it the pure-Python implementation is used. The constants the extension needs are
+rendered from ``tax_constants.py`` into ``tax_constants.pxi`` at build time.
+"""
+from setuptools import setup, Extension
+from Cython.Build import cythonize
+import numpy as np
+
+import tax_constants as tc
+
+
+def _c_double(value) -> str:
+    """Cython literal for *value*; the open-ended top bracket becomes libc's INFINITY."""
+    value = float(value)
+    return "INFINITY" if value == float("inf") else repr(value)
+
+
+def write_constants_pxi(path: str = "tax_constants.pxi") -> None:
+    """Render the constants used by tax_calc.pyx from tax_constants.py.
+
+    The file is only rewritten when its content changes so Cython does not rebuild needlessly.
+    """
+    scalars = {
+        "MIN_BASE": tc.MIN_BASE,
+        "MAX_BASE": tc.MAX_BASE,
+        "PENSION_RATE": tc.SOCIAL_RATES["pension"],
+        "MEDICAL_RATE": tc.SOCIAL_RATES["medical"],
+        "UNEMPLOYMENT_RATE": tc.SOCIAL_RATES["unemployment"],
+        "HOUSING_FUND_RATE": tc.HOUSING_FUND_RATE,
+        "HOUSING_FUND_RATE_EMPLOYER": tc.HOUSING_FUND_RATE_EMPLOYER,
+        "STANDARD_DEDUCTION_MONTHLY": tc.STANDARD_DEDUCTION_MONTHLY,
+    }
+    n = len(tc.ANNUAL_TAX_BRACKETS)
+    lines = ["# Generated by setup.py from tax_constants.py; do not edit.", ""]
+    lines += [f"cdef double {name} = {_c_double(value)}" for name, value in scalars.items()]
+    lines += ["", f"cdef int N_MONTHLY = {len(tc.MONTHLY_KEYS)}", f"cdef int N_TOTALS = {len(tc.TOTAL_KEYS)}"]
+    lines += ["", f"cdef int N_BRACKETS = {n}"]
+    for name, column in zip(("A_LIMITS", "A_RATES", "A_QUICKS"), zip(*tc.ANNUAL_TAX_BRACKETS)):
+        lines.append(f"cdef double[{n}] {name} = [{', '.join(map(_c_double, column))}]")
+    content = "\n".join(lines) + "\n"
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == content:
+                return
+    except FileNotFoundError:
+        pass
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+
+
+write_constants_pxi()
+
+setup(
+    name="tax_calc",
+    ext_modules=cythonize(
+        [Extension("tax_calc", ["tax_calc.pyx"], include_dirs=[np.get_include()])],
+        compiler_directives={"language_level": 3, "cdivision": True},
+    ),
+)
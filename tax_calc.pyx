@@ -0,0 +1,140 @@
+# cython: language_level=3
+"""Compiled core of ``tax_calculator.yearly_salary_details``.
+
+Build in place with:  python setup.py build_ext --inplace
+The constants come from ``tax_constants.py`` via the generated ``tax_constants.pxi``.
+"""
+
+cimport cython
+from libc.math cimport floor, fma, fmod, INFINITY
+import numpy as np
+
+# MIN_BASE, the rates, STANDARD_DEDUCTION_MONTHLY, the annual bracket table (A_LIMITS, A_RATES,
+# A_QUICKS) and the output shapes N_MONTHLY / N_TOTALS (see MONTHLY_KEYS and TOTAL_KEYS),
+# generated from tax_constants.py by setup.py
+include "tax_constants.pxi"
+
+cdef struct SocialResult:
+    double pension
+    double medical
+    double unemployment
+    double housing_fund
+    double total
+
+
+cdef inline double _r_c(double value, bint to_int) nogil:
+    """Round value to 2 decimals or nearest integer (0.5 up) depending on *to_int*."""
+    cdef double y, r, err
+    if to_int:
+        return floor(value + 0.5)
+    # match Python's correctly rounded round(value, 2): when value * 100 lands exactly on a
+    # .5 tie, use the exact product error to see which side the true value lies on
+    y = value * 100.0
+    r = floor(y + 0.5)
+    if r - y == 0.5:
+        err = fma(value, 100.0, -y)
+        if err < 0.0 or (err == 0.0 and fmod(r, 2.0) != 0.0):
+            r -= 1.0
+    return r / 100.0
+
+
+def _r(double value, bint to_int):
+    """Python-visible :func:`_r_c`, so tests can check it against ``round()``."""
+    return _r_c(value, to_int)
+
+
+cdef inline double _cap_base_c(double salary) nogil:
+    """Clamp contribution base to [MIN_BASE, MAX_BASE]."""
+    if salary < MIN_BASE:
+        return MIN_BASE
+    if salary > MAX_BASE:
+        return MAX_BASE
+    return salary
+
+
+cdef inline SocialResult _social_c(double base, bint round_int) nogil:
+    """Employee-side contributions, each rounded, plus the (unrounded) sum of the rounded values."""
+    cdef SocialResult s
+    s.pension = _r_c(base * PENSION_RATE, round_int)
+    s.medical = _r_c(base * MEDICAL_RATE + 3, round_int)
+    s.unemployment = _r_c(base * UNEMPLOYMENT_RATE, round_int)
+    s.housing_fund = _r_c(base * HOUSING_FUND_RATE, round_int)
+    s.total = s.pension + s.medical + s.unemployment + s.housing_fund
+    return s
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline double _tax_c(double t) nogil:
+    """Annual bracket tax for cumulative taxable income *t* (2 decimals)."""
+    cdef int i
+    for i in range(N_BRACKETS):
+        if t <= A_LIMITS[i]:
+            return _r_c(t * A_RATES[i] - A_QUICKS[i], False)
+    return 0.0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _yearly_details_core(double[::1] gross_list, bint round_int):
+    """Cumulative-withholding loop over *gross_list*.
+
+    Returns an ``(11, len(gross_list))`` array holding one row per output column and a
+    length-6 totals array, both already rounded according to *round_int*.
+    """
+    cdef Py_ssize_t n = gross_list.shape[0]
+    cdef Py_ssize_t i, k
+    monthly = np.empty((N_MONTHLY, n), dtype=np.float64)
+    cdef double[::1] gross_out = monthly[0]
+    cdef double[::1] pension_out = monthly[1]
+    cdef double[::1] medical_out = monthly[2]
+    cdef double[::1] unemployment_out = monthly[3]
+    cdef double[::1] housing_fund_out = monthly[4]
+    cdef double[::1] social_total_out = monthly[5]
+    cdef double[::1] personal_housing_out = monthly[6]
+    cdef double[::1] company_housing_out = monthly[7]
+    cdef double[::1] housing_total_out = monthly[8]
+    cdef double[::1] tax_out = monthly[9]
+    cdef double[::1] net_out = monthly[10]
+    cdef double[::1] totals = np.zeros(N_TOTALS, dtype=np.float64)
+    cdef double gross, base, company_housing, month_tax, net
+    cdef double cumulative_taxable = 0.0
+    cdef double cumulative_tax_paid = 0.0
+    cdef SocialResult social
+
+    with nogil:
+        for i in range(n):
+            gross = gross_list[i]
+            base = _cap_base_c(gross)
+            social = _social_c(base, round_int)
+            company_housing = _r_c(base * HOUSING_FUND_RATE_EMPLOYER, round_int)
+
+            cumulative_taxable += gross - social.total - STANDARD_DEDUCTION_MONTHLY
+            month_tax = _tax_c(cumulative_taxable if cumulative_taxable > 0.0 else 0.0) - cumulative_tax_paid
+            month_tax = _r_c(month_tax if month_tax > 0.0 else 0.0, round_int)
+            cumulative_tax_paid += month_tax
+            net = _r_c(gross - social.total - month_tax, round_int)
+
+            gross_out[i] = _r_c(gross, round_int)
+            pension_out[i] = social.pension
+            medical_out[i] = social.medical
+            unemployment_out[i] = social.unemployment
+            housing_fund_out[i] = social.housing_fund
+            social_total_out[i] = _r_c(social.total, round_int)
+            personal_housing_out[i] = social.housing_fund
+            company_housing_out[i] = company_housing
+            housing_total_out[i] = _r_c(social.housing_fund + company_housing, round_int)
+            tax_out[i] = month_tax
+            net_out[i] = net
+
+            totals[0] += gross
+            totals[1] += social.total
+            totals[2] += social.housing_fund
+            totals[3] += company_housing
+            totals[4] += month_tax
+            totals[5] += net
+
+        for k in range(N_TOTALS):
+            totals[k] = _r_c(totals[k], round_int)
+
+    return monthly, np.asarray(totals)
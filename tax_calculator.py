@@ -1,102 +1,311 @@
-from typing import Dict, List
-import math
-import pandas as pd
-import os
-
-MIN_BASE = 2690
-MAX_BASE = 36921
-SOCIAL_RATES = {"pension": 0.08, "medical": 0.02, "unemployment": 0.005}
-HOUSING_FUND_RATE = 0.07
-HOUSING_FUND_RATE_EMPLOYER = 0.07
-STANDARD_DEDUCTION_MONTHLY = 5000
-STANDARD_DEDUCTION_ANNUAL = STANDARD_DEDUCTION_MONTHLY * 12
-MONTHLY_TAX_BRACKETS = [
-    (3000, 0.03, 0),
-    (12000, 0.10, 210),
-    (25000, 0.20, 1410),
-    (35000, 0.25, 2660),
-    (55000, 0.30, 4410),
-    (80000, 0.35, 7160),
-    (float('inf'), 0.45, 15160),
-]
-ANNUAL_TAX_BRACKETS = [
-    (36000, 0.03, 0),
-    (144000, 0.10, 2520),
-    (300000, 0.20, 16920),
-    (420000, 0.25, 31920),
-    (660000, 0.30, 52920),
-    (960000, 0.35, 85920),
-    (float('inf'), 0.45, 181920),
-]
+from typing import TYPE_CHECKING, Dict, List, Tuple
+from functools import lru_cache
+from math import floor
+import numpy as np
+import csv
+
+# pandas is imported lazily where DataFrames are built, keeping CLI start-up fast
+if TYPE_CHECKING:
+    import pandas as pd
+
+try:
+    # optional compiled core, build with `python setup.py build_ext --inplace`
+    from tax_calc import _yearly_details_core
+except ImportError:
+    _yearly_details_core = None
+
+from tax_constants import (
+    MIN_BASE,
+    MAX_BASE,
+    SOCIAL_RATES,
+    HOUSING_FUND_RATE,
+    HOUSING_FUND_RATE_EMPLOYER,
+    STANDARD_DEDUCTION_MONTHLY,
+    STANDARD_DEDUCTION_ANNUAL,
+    MONTHLY_TAX_BRACKETS,
+    ANNUAL_TAX_BRACKETS,
+    MONTHLY_TAX_BRACKET_ARRAYS,
+    ANNUAL_TAX_BRACKET_ARRAYS,
+    MONTHLY_KEYS,
+    TOTAL_KEYS,
+)
+
+# Bracket tables split into parallel (limits, rates, quick deductions) tuples
+_M_LIMITS, _M_RATES, _M_QUICKS = zip(*MONTHLY_TAX_BRACKETS)
+_A_LIMITS, _A_RATES, _A_QUICKS = zip(*ANNUAL_TAX_BRACKETS)
+_BRACKETS = {
+    'monthly': (_M_LIMITS, _M_RATES, _M_QUICKS),
+    'annual': (_A_LIMITS, _A_RATES, _A_QUICKS),
+}
+
+# The same tables as float64 arrays for np.searchsorted
+_BRACKETS_NP = {
+    'monthly': MONTHLY_TAX_BRACKET_ARRAYS,
+    'annual': ANNUAL_TAX_BRACKET_ARRAYS,
+}
+
+# Employee-side rates in _social order (medical also adds a fixed 3 yuan)
+_SOCIAL_COMPONENT_RATES = np.array([
+    SOCIAL_RATES['pension'], SOCIAL_RATES['medical'], SOCIAL_RATES['unemployment'], HOUSING_FUND_RATE,
+])
+_SOCIAL_COMPONENT_FIXED = np.array([0.0, 3.0, 0.0, 0.0])
 
 def _cap_base(salary: float) -> float:
     """Clamp contribution base to the legal range [MIN_BASE, MAX_BASE] as required by Shanghai social insurance rules."""
-    return max(MIN_BASE, min(salary, MAX_BASE))
+    return MIN_BASE if salary < MIN_BASE else (MAX_BASE if salary > MAX_BASE else salary)
 
-def _r(value: float, to_int: bool) -> float:
-    """Round value to 2 decimals or nearest integer (0.5 up) depending on *to_int*."""
-    if to_int:
-        return int(math.floor(value + 0.5))
+# Array version of _cap_base: _cap_base_vec(salaries, MIN_BASE, MAX_BASE)
+_cap_base_vec = np.clip
+
+def _round_int(value: float) -> int:
+    """Round to nearest integer, 0.5 up."""
+    # math.floor already returns an int; unlike int(value + 0.5) it is also right for negatives
+    return floor(value + 0.5)
+
+def _round_2dp(value: float) -> float:
+    """Round to 2 decimals."""
     return round(value, 2)
 
-def _social(base: float, round_int: bool) -> Dict[str, float]:
-    """Calculate employee-side contributions for pension, medical, unemployment insurance and housing fund."""
-    pension = base * SOCIAL_RATES['pension']
-    medical = base * SOCIAL_RATES['medical'] + 3
-    unemployment = base * SOCIAL_RATES['unemployment']
-    housing = base * HOUSING_FUND_RATE
+def _r(value: float, to_int: bool) -> float:
+    """Round value to 2 decimals or nearest integer (0.5 up) depending on *to_int*.
+
+    Hot paths resolve the rounder once via ``_round_int if round_int else _round_2dp`` instead.
+    """
+    return _round_int(value) if to_int else _round_2dp(value)
+
+def _social(base: float, _round) -> Tuple[Dict[str, float], float]:
+    """Calculate employee-side contributions for pension, medical, unemployment insurance and housing fund.
+
+    *_round* is the rounding function, :func:`_round_int` or :func:`_round_2dp`. Returns the rounded
+    components and the (unrounded) sum of those rounded values, so callers need not sum the dict.
+    """
+    pension = _round(base * SOCIAL_RATES['pension'])
+    medical = _round(base * SOCIAL_RATES['medical'] + 3)
+    unemployment = _round(base * SOCIAL_RATES['unemployment'])
+    housing = _round(base * HOUSING_FUND_RATE)
     return {
-        'pension': _r(pension, round_int),
-        'medical': _r(medical, round_int),
-        'unemployment': _r(unemployment, round_int),
-        'housing_fund': _r(housing, round_int),
-    }
+        'pension': pension,
+        'medical': medical,
+        'unemployment': unemployment,
+        'housing_fund': housing,
+    }, pension + medical + unemployment + housing
 
-def _tax(taxable: float, brackets):
-    """Compute personal income tax for the given taxable income using a bracket table.
+def _build_tax_func(kind: str, round_int: bool):
+    """Generate the personal income tax function for one bracket table and rounding mode.
+
+    The generated ``f(t)`` returns the tax on taxable income *t* (after social security, housing
+    fund and standard deduction), rounded to 2 decimals and then, if *round_int*, to an integer.
+    It is a chain of ``if t <= limit: return ...`` tests on literals, so no table lookups or
+    tuple indexing happen at call time.
 
     Parameters
     ----------
-    taxable : float
-        Taxable income after social security, housing fund and standard deduction.
-    brackets : list[tuple]
-        Tax brackets defined as (upper_limit, rate, quick_deduction).
+    kind : str
+        Bracket table to use: ``'monthly'`` or ``'annual'``.
+    round_int : bool
+        If True, round the tax to the nearest integer; otherwise keep two decimals.
+    """
+    limits, rates, quicks = _BRACKETS[kind]
+    name = f"_tax_{kind}_{'int' if round_int else '2dp'}"
+    # double rounding in int mode: 2 decimals first, then 0.5 up
+    expr = "floor(round({}, 2) + 0.5)" if round_int else "round({}, 2)"
+    lines = [f"def {name}(t):"]
+    for limit, rate, quick in zip(limits[:-1], rates, quicks):
+        lines.append(f"    if t <= {limit!r}:")
+        lines.append("        return " + expr.format(f"t * {rate!r} - {quick!r}"))
+    lines.append("    return " + expr.format(f"t * {rates[-1]!r} - {quicks[-1]!r}"))
+    namespace = {"floor": floor}
+    exec(compile("\n".join(lines), f"<{name}>", "exec"), namespace)
+    return namespace[name]
+
+# _tax_dispatch[kind][bool(round_int)](taxable) -> tax on *taxable* with the *kind* brackets
+_tax_dispatch = {kind: (_build_tax_func(kind, False), _build_tax_func(kind, True)) for kind in _BRACKETS}
+
+def _round_vec(values: np.ndarray, to_int: bool) -> np.ndarray:
+    """Vectorised :func:`_r`: same results as rounding each element, ties included."""
+    if to_int:
+        return np.floor(values + 0.5)
+    y = values * 100.0
+    r = np.floor(y + 0.5)
+    tie = (r - y) == 0.5
+    if tie.any():
+        # values * 100 landed exactly on a .5 tie; use the product's exact rounding error
+        # (Dekker split) to pick the side round(value, 2) would pick
+        c = 134217729.0 * values
+        hi = c - (c - values)
+        err = (hi * 100.0 - y) + (values - hi) * 100.0
+        r -= tie & ((err < 0.0) | ((err == 0.0) & (r % 2.0 != 0.0)))
+    return r / 100.0
+
+def _tax_vec(taxable: np.ndarray, kind: str) -> np.ndarray:
+    """Vectorised ``_tax_dispatch[kind][False]`` over an array of taxable incomes."""
+    limits, rates, quicks = _BRACKETS_NP[kind]
+    i = np.searchsorted(limits, taxable, side='left')
+    return _round_vec(taxable * rates[i] - quicks[i], False)
+
+def _yearly_core_py(gross_list, round_int: bool):
+    """Pure-Python cumulative-withholding loop, used when neither compiled core is available.
+
+    Same results as ``tax_calc._yearly_details_core`` and ``tax_numba._yearly_core``, but works on
+    plain floats and returns ``(rows, totals)``: one tuple per month in MONTHLY_KEYS order and a
+    list in TOTAL_KEYS order, already rounded according to *round_int*.
     """
-    for limit, rate, quick in brackets:
-        if taxable <= limit:
-            return round(taxable * rate - quick, 2)
-    return 0.0
+    _round = _round_int if round_int else _round_2dp
+    annual_tax = _tax_dispatch['annual'][False]
+    rows = []
+    totals = [0.0] * len(TOTAL_KEYS)
+    cumulative_taxable = 0.0
+    cumulative_tax_paid = 0.0
+
+    for gross in gross_list:
+        base = MIN_BASE if gross < MIN_BASE else (MAX_BASE if gross > MAX_BASE else gross)
+        pension = _round(base * SOCIAL_RATES['pension'])
+        medical = _round(base * SOCIAL_RATES['medical'] + 3)
+        unemployment = _round(base * SOCIAL_RATES['unemployment'])
+        personal_housing = _round(base * HOUSING_FUND_RATE)
+        company_housing = _round(base * HOUSING_FUND_RATE_EMPLOYER)
+        personal_social_total = pension + medical + unemployment + personal_housing
+
+        # cumulative taxable income up to this month
+        cumulative_taxable += gross - personal_social_total - STANDARD_DEDUCTION_MONTHLY
+        cumulative_tax = annual_tax(max(0.0, cumulative_taxable))
+        month_tax = _round(max(0.0, cumulative_tax - cumulative_tax_paid))
+        cumulative_tax_paid += month_tax
+        net = _round(gross - personal_social_total - month_tax)
+
+        rows.append((
+            _round(gross), pension, medical, unemployment, personal_housing,
+            _round(personal_social_total), personal_housing, company_housing,
+            _round(personal_housing + company_housing), month_tax, net,
+        ))
+
+        totals[0] += gross
+        totals[1] += personal_social_total
+        totals[2] += personal_housing
+        totals[3] += company_housing
+        totals[4] += month_tax
+        totals[5] += net
+
+    return rows, [_round(v) for v in totals]
+
+_yearly_core = None
+
+def _get_yearly_core():
+    """Resolve the core behind :func:`yearly_salary_details` on first use.
+
+    Prefers the Cython ``tax_calc`` extension, then the numba ``tax_numba`` module (imported
+    only here, so numba costs nothing at start-up), then :func:`_yearly_core_py`.
+    """
+    global _yearly_core
+    if _yearly_core is None:
+        if _yearly_details_core is not None:
+            _yearly_core = _yearly_details_core
+        else:
+            try:
+                from tax_numba import _yearly_core as core
+            except ImportError:
+                core = _yearly_core_py
+            _yearly_core = core
+    return _yearly_core
 
 def monthly_net(gross: float, round_int: bool = False):
     """Return social contributions, personal income tax and net salary for a given gross monthly wage."""
+    return dict(_monthly_net_cached(gross, round_int))
+
+@lru_cache(maxsize=4096)
+def _monthly_net_cached(gross: float, round_int: bool) -> tuple:
+    """Memoised body of :func:`monthly_net`; returns the items as a tuple so cached results stay immutable."""
+    _round = _round_int if round_int else _round_2dp
     base = _cap_base(gross)
-    social = _social(base, round_int)
-    social_total_val = sum(social.values())
-    social_total = _r(social_total_val, round_int)
+    social, social_total_val = _social(base, _round)
+    social_total = _round(social_total_val)
     taxable = max(0, gross - social_total_val - STANDARD_DEDUCTION_MONTHLY)
-    tax = _r(_tax(taxable, MONTHLY_TAX_BRACKETS), round_int)
-    net = _r(gross - social_total_val - tax, round_int)
-    return {**social, 'social_total': social_total, 'taxable': _r(taxable, round_int), 'tax': tax, 'net': net}
+    tax = _tax_dispatch['monthly'][bool(round_int)](taxable)
+    net = _round(gross - social_total_val - tax)
+    return tuple({**social, 'social_total': social_total, 'taxable': _round(taxable), 'tax': tax, 'net': net}.items())
+
+@lru_cache(maxsize=None)
+def _batch_kernel():
+    """The numba gufunc behind :func:`monthly_net_batch`, or None without numba; resolved once."""
+    try:
+        from tax_numba import _monthly_net_kernel
+    except ImportError:
+        return None
+    return _monthly_net_kernel()
+
+def monthly_net_batch(gross, round_int: bool = False) -> "pd.DataFrame":
+    """Vectorised :func:`monthly_net` for many gross monthly wages at once.
+
+    Parameters
+    ----------
+    gross : float or array-like of float
+        Gross monthly wages, one per employee; a scalar gives a one-row frame.
+    round_int : bool, optional
+        If True, round all numeric outputs to nearest integer; otherwise keep two decimals.
+
+    Returns
+    -------
+    pandas.DataFrame
+        One row per input wage with the same columns as :func:`monthly_net` plus ``gross``.
+
+    Runs as a numba gufunc when numba is installed, otherwise with NumPy array operations.
+    """
+    import pandas as pd
+
+    gross = np.atleast_1d(np.asarray(gross, dtype=np.float64))
+    kernel = _batch_kernel()
+    if kernel is not None:
+        pension, medical, unemployment, housing, social_total, taxable, tax, net = kernel(gross, bool(round_int))
+    else:
+        base = _cap_base_vec(gross, MIN_BASE, MAX_BASE)
+        pension, medical, unemployment, housing = _round_vec(
+            np.multiply.outer(base, _SOCIAL_COMPONENT_RATES) + _SOCIAL_COMPONENT_FIXED, round_int
+        ).T
+        social_total = pension + medical + unemployment + housing
+        taxable = np.maximum(0, gross - social_total - STANDARD_DEDUCTION_MONTHLY)
+        # round the tax before it is subtracted, exactly as monthly_net does
+        tax = _round_vec(_tax_vec(taxable, 'monthly'), round_int)
+        net = gross - social_total - tax
+
+    columns = {
+        'gross': gross,
+        'pension': pension,
+        'medical': medical,
+        'unemployment': unemployment,
+        'housing_fund': housing,
+        'social_total': social_total,
+        'taxable': taxable,
+        'tax': tax,
+        'net': net,
+    }
+    dtype = np.int64 if round_int else np.float64
+    return pd.DataFrame({k: _round_vec(v, round_int).astype(dtype) for k, v in columns.items()})
 
 def annual_net(gross_annual: float, round_int: bool = False):
     """Return yearly social contributions, annual income tax and net income for a given gross annual salary."""
+    return dict(_annual_net_cached(gross_annual, round_int))
+
+@lru_cache(maxsize=4096)
+def _annual_net_cached(gross_annual: float, round_int: bool) -> tuple:
+    """Memoised body of :func:`annual_net`; returns the items as a tuple so cached results stay immutable."""
+    _round = _round_int if round_int else _round_2dp
     avg = gross_annual / 12
     base = _cap_base(avg)
-    social_m = _social(base, round_int)
-    social_total_year_val = sum(social_m.values()) * 12
-    social_total_year = _r(social_total_year_val, round_int)
+    social_m, social_total_m = _social(base, _round)
+    social_total_year_val = social_total_m * 12
+    social_total_year = _round(social_total_year_val)
     taxable = max(0, gross_annual - social_total_year_val - STANDARD_DEDUCTION_ANNUAL)
-    tax = _r(_tax(taxable, ANNUAL_TAX_BRACKETS), round_int)
-    net = _r(gross_annual - social_total_year_val - tax, round_int)
-    return {k+'_year': (_r(v*12, round_int)) for k,v in social_m.items() } | {
+    tax = _tax_dispatch['annual'][bool(round_int)](taxable)
+    net = _round(gross_annual - social_total_year_val - tax)
+    return tuple(({k+'_year': _round(v*12) for k,v in social_m.items() } | {
         'social_total_annual': social_total_year,
-        'taxable_annual': _r(taxable, round_int),
+        'taxable_annual': _round(taxable),
         'tax_annual': tax,
         'net_annual': net,
-        'net_monthly_equivalent': _r(net/12, round_int)
-    }
+        'net_monthly_equivalent': _round(net/12)
+    }).items())
 
-def yearly_salary_details(gross_monthly: List[float], round_int: bool = False):
+def yearly_salary_details(gross_monthly: List[float], round_int: bool = False, as_dict: bool = True):
     """Return detailed monthly and yearly salary breakdown using cumulative withholding method.
 
     Parameters
@@ -106,78 +315,86 @@ def yearly_salary_details(gross_monthly: List[float], round_int: bool = False):
         are assumed to have 0 income.
     round_int : bool, optional
         If True, round all numeric outputs to nearest integer; otherwise keep two decimals.
+    as_dict : bool, optional
+        If True (default), "monthly" is a list of per-month dicts; if False it is a
+        ``pandas.DataFrame`` built directly from the column arrays.
 
     Returns
     -------
     dict
         {
-          "monthly": [ {...}, ... ],
+          "monthly": [ {...}, ... ] or DataFrame,
           "totals": {...}
         }
     """
 
-    # ensure length 12
-    gross_list = (gross_monthly + [0.0] * 12)[:12]
-
-    monthly_details = []
-    cumulative_taxable = 0.0
-    cumulative_tax_paid = 0.0
-
-    totals = {
-        "gross_annual": 0.0,
-        "social_personal_annual": 0.0,
-        "housing_personal_annual": 0.0,
-        "housing_company_annual": 0.0,
-        "tax_annual": 0.0,
-        "net_annual": 0.0,
+    cast = int if round_int else float
+    core = _yearly_core or _get_yearly_core()
+    if core is _yearly_core_py:
+        # ensure length 12; the interpreted loop is fastest on plain floats and already returns
+        # per-month rows of Python numbers
+        gross_list = list(gross_monthly[:12])
+        gross_list.extend([0.0] * (12 - len(gross_list)))
+        rows, totals = core(gross_list, round_int)
+        columns = None
+    else:
+        # ensure length 12: fill a zeroed buffer that feeds the compiled core directly
+        gross_arr = np.zeros(12, dtype=np.float64)
+        n = min(len(gross_monthly), 12)
+        gross_arr[:n] = gross_monthly[:n]
+        columns, totals = core(gross_arr, round_int)
+        totals = map(cast, totals.tolist())
+        rows = None
+    totals = dict(zip(TOTAL_KEYS, totals))
+
+    if not as_dict:
+        import pandas as pd
+
+        dtype = np.int64 if round_int else np.float64
+        columns = np.array(rows, dtype=dtype).T if columns is None else columns.astype(dtype, copy=False)
+        monthly_df = pd.DataFrame({"month": np.arange(1, 13), **dict(zip(MONTHLY_KEYS, columns))})
+        return {"monthly": monthly_df, "totals": totals}
+
+    if rows is None:
+        rows = zip(*(map(cast, col) for col in columns.tolist()))
+    return {
+        "monthly": [
+            {"month": idx, **dict(zip(MONTHLY_KEYS, row))}
+            for idx, row in enumerate(rows, start=1)
+        ],
+        "totals": totals,
     }
 
-    for idx, gross in enumerate(gross_list, start=1):
-        base = _cap_base(gross)
-        social = _social(base, round_int)
-        personal_social_total = sum(social.values())
+def _write_csv(path: str, header, rows) -> None:
+    """Write *header* and *rows* to *path* with the csv module."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(header)
+        writer.writerows(rows)
 
-        # housing fund parts
-        personal_housing = social["housing_fund"]
-        company_housing = _r(base * HOUSING_FUND_RATE_EMPLOYER, round_int)
+def save_details_csv(result: dict, prefix: str, out_dir: str = "output_csv") -> Tuple[str, str]:
+    """Save a :func:`yearly_salary_details` result as ``<prefix>_monthly.csv`` and ``<prefix>_totals.csv``.
 
-        # cumulative taxable income up to this month
-        cumulative_taxable += gross - personal_social_total - STANDARD_DEDUCTION_MONTHLY
-
-        taxable_for_bracket = max(0.0, cumulative_taxable)
-        cumulative_tax = _tax(taxable_for_bracket, ANNUAL_TAX_BRACKETS)
-        month_tax_raw = cumulative_tax - cumulative_tax_paid
-        month_tax = _r(max(0.0, month_tax_raw), round_int)
-        cumulative_tax_paid += month_tax
-
-        net = _r(gross - personal_social_total - month_tax, round_int)
-
-        details = {
-            "month": idx,
-            "gross": _r(gross, round_int),
-            **social,
-            "social_total": _r(personal_social_total, round_int),
-            "personal_housing": personal_housing,
-            "company_housing": company_housing,
-            "housing_total": _r(personal_housing + company_housing, round_int),
-            "tax": month_tax,
-            "net": net,
-        }
-        monthly_details.append(details)
+    Accepts either result form (``as_dict=True`` or ``False``) and returns the two file paths.
+    """
+    import os
 
-        # accumulate totals
-        totals["gross_annual"] += gross
-        totals["social_personal_annual"] += personal_social_total
-        totals["housing_personal_annual"] += personal_housing
-        totals["housing_company_annual"] += company_housing
-        totals["tax_annual"] += month_tax
-        totals["net_annual"] += net
+    os.makedirs(out_dir, exist_ok=True)
+    monthly_file = os.path.join(out_dir, f"{prefix}_monthly.csv")
+    totals_file = os.path.join(out_dir, f"{prefix}_totals.csv")
 
-    # apply rounding to totals
-    for k, v in totals.items():
-        totals[k] = _r(v, round_int)
+    monthly = result["monthly"]
+    if isinstance(monthly, list):
+        header = list(monthly[0])
+        rows = (row.values() for row in monthly)
+    else:  # DataFrame from as_dict=False
+        header = list(monthly.columns)
+        rows = zip(*(monthly[col].tolist() for col in header))
+    _write_csv(monthly_file, header, rows)
 
-    return {"monthly": monthly_details, "totals": totals}
+    totals = result["totals"]
+    _write_csv(totals_file, list(totals), [totals.values()])
+    return monthly_file, totals_file
 
 if __name__ == '__main__':
     import argparse, json
@@ -218,21 +435,8 @@ if __name__ == '__main__':
         result = yearly_salary_details(monthly_list, args.round_int)
         
         if args.csv:
-            # 确保 output_csv 目录存在
-            os.makedirs("output_csv", exist_ok=True)
-            
-            # 构建输出文件路径
-            monthly_file = os.path.join("output_csv", f"{args.csv}_monthly.csv")
-            totals_file = os.path.join("output_csv", f"{args.csv}_totals.csv")
-            
-            # 保存月度明细
-            monthly_df = pd.DataFrame(result["monthly"])
-            monthly_df.to_csv(monthly_file, index=False)
-            
-            # 保存年度汇总
-            totals_df = pd.DataFrame([result["totals"]])
-            totals_df.to_csv(totals_file, index=False)
-            
+            # 保存月度明细和年度汇总到 output_csv 目录
+            monthly_file, totals_file = save_details_csv(result, args.csv)
             print(f"Results saved to:\n- {monthly_file}\n- {totals_file}")
         else:
             print(json.dumps(result, ensure_ascii=False, indent=2)) 
@@ -1,9 +1,6 @@
 # 使用方式：在 Terminal 中执行： streamlit run tax_calculator_app.py
 
 import streamlit as st
-import pandas as pd
-from tax_calculator import monthly_net, annual_net, yearly_salary_details
-import os
 
 st.set_page_config(
     page_title="上海个税计算器",
@@ -13,6 +10,28 @@ st.set_page_config(
 
 st.title("上海个税计算器 💰")
 
+# 计算模块每个进程只导入一次，脚本重跑时直接复用（numba 在首次明细计算时才加载）
+@st.cache_resource(show_spinner=False)
+def _get_calculators():
+    from tax_calculator import monthly_net, annual_net, yearly_salary_details, save_details_csv
+    return monthly_net, annual_net, yearly_salary_details, save_details_csv
+
+monthly_net, annual_net, yearly_salary_details, save_details_csv = _get_calculators()
+
+# 缓存计算结果：Streamlit 每次交互都会重跑脚本，输入不变时直接复用
+@st.cache_data
+def _monthly(amount, round_int):
+    return monthly_net(amount, round_int)
+
+@st.cache_data
+def _annual(amount, round_int):
+    return annual_net(amount, round_int)
+
+@st.cache_data
+def _yearly_details(amount, round_int):
+    # 12个月相同工资，月度明细直接以 DataFrame 返回
+    return yearly_salary_details([amount] * 12, round_int, as_dict=False)
+
 # 创建侧边栏，用于选择计算模式
 calculation_mode = st.sidebar.radio(
     "选择计算模式",
@@ -34,10 +53,7 @@ if calculation_mode == "月度工资计算":
     )
     
     if st.button("计算"):
-        result = monthly_net(monthly_salary, round_int)
-        
-        # 转换为 DataFrame 并显示
-        df = pd.DataFrame([result])
+        result = _monthly(monthly_salary, round_int)
         
         # 显示主要结果
         col1, col2, col3 = st.columns(3)
@@ -48,9 +64,9 @@ if calculation_mode == "月度工资计算":
         with col3:
             st.metric("税后工资", f"¥{result['net']:,.2f}")
         
-        # 显示详细分项
+        # 显示详细分项（单条结果直接展示字典，无需构建 DataFrame）
         st.subheader("详细分项")
-        st.dataframe(df)
+        st.json(result)
 
 elif calculation_mode == "年度工资计算":
     st.header("年度工资计算")
@@ -64,10 +80,7 @@ elif calculation_mode == "年度工资计算":
     )
     
     if st.button("计算"):
-        result = annual_net(annual_salary, round_int)
-        
-        # 转换为 DataFrame 并显示
-        df = pd.DataFrame([result])
+        result = _annual(annual_salary, round_int)
         
         # 显示主要结果
         col1, col2, col3 = st.columns(3)
@@ -81,9 +94,9 @@ elif calculation_mode == "年度工资计算":
         # 显示月均值
         st.metric("月均税后工资", f"¥{result['net_monthly_equivalent']:,.2f}")
         
-        # 显示详细分项
+        # 显示详细分项（单条结果直接展示字典，无需构建 DataFrame）
         st.subheader("详细分项")
-        st.dataframe(df)
+        st.json(result)
 
 else:  # 12个月详细计算
     st.header("12个月详细计算")
@@ -105,13 +118,10 @@ else:  # 12个月详细计算
             csv_filename = st.text_input("CSV文件名前缀", value="salary_details")
     
     if st.button("计算"):
-        # 创建12个月的工资列表
-        monthly_list = [monthly_salary] * 12
-        result = yearly_salary_details(monthly_list, round_int)
+        result = _yearly_details(monthly_salary, round_int)
         
         # 显示年度汇总
         st.subheader("年度汇总")
-        totals_df = pd.DataFrame([result["totals"]])
         
         # 显示主要结果
         col1, col2, col3 = st.columns(3)
@@ -124,21 +134,12 @@ else:  # 12个月详细计算
         
         # 显示月度明细
         st.subheader("月度明细")
-        monthly_df = pd.DataFrame(result["monthly"])
+        monthly_df = result["monthly"]
         st.dataframe(monthly_df)
         
         # 导出CSV
         if export_csv:
-            # 确保output_csv目录存在
-            os.makedirs("output_csv", exist_ok=True)
-            
-            # 保存文件
-            monthly_file = os.path.join("output_csv", f"{csv_filename}_monthly.csv")
-            totals_file = os.path.join("output_csv", f"{csv_filename}_totals.csv")
-            
-            monthly_df.to_csv(monthly_file, index=False)
-            totals_df.to_csv(totals_file, index=False)
-            
+            monthly_file, totals_file = save_details_csv(result, csv_filename)
             st.success(f"CSV文件已保存到:\n- {monthly_file}\n- {totals_file}")
 
 # 添加页脚
@@ -0,0 +1,51 @@
+"""Shanghai social insurance, housing fund and individual income tax parameters."""
+
+import numpy as np
+
+MIN_BASE = 2690
+MAX_BASE = 36921
+SOCIAL_RATES = {"pension": 0.08, "medical": 0.02, "unemployment": 0.005}
+HOUSING_FUND_RATE = 0.07
+HOUSING_FUND_RATE_EMPLOYER = 0.07
+STANDARD_DEDUCTION_MONTHLY = 5000
+STANDARD_DEDUCTION_ANNUAL = STANDARD_DEDUCTION_MONTHLY * 12
+MONTHLY_TAX_BRACKETS = [
+    (3000, 0.03, 0),
+    (12000, 0.10, 210),
+    (25000, 0.20, 1410),
+    (35000, 0.25, 2660),
+    (55000, 0.30, 4410),
+    (80000, 0.35, 7160),
+    (float('inf'), 0.45, 15160),
+]
+ANNUAL_TAX_BRACKETS = [
+    (36000, 0.03, 0),
+    (144000, 0.10, 2520),
+    (300000, 0.20, 16920),
+    (420000, 0.25, 31920),
+    (660000, 0.30, 52920),
+    (960000, 0.35, 85920),
+    (float('inf'), 0.45, 181920),
+]
+
+# The bracket tables as float64 (limits, rates, quick deductions) arrays for np.searchsorted and
+# the numba cores; the open-ended top bracket uses the largest finite double instead of inf
+MONTHLY_TAX_BRACKET_ARRAYS, ANNUAL_TAX_BRACKET_ARRAYS = (
+    (
+        np.minimum(np.array(limits, dtype=np.float64), np.finfo(np.float64).max),
+        np.array(rates, dtype=np.float64),
+        np.array(quicks, dtype=np.float64),
+    )
+    for limits, rates, quicks in (zip(*MONTHLY_TAX_BRACKETS), zip(*ANNUAL_TAX_BRACKETS))
+)
+
+# Column order of the per-month rows and yearly totals returned by
+# tax_calculator.yearly_salary_details; every core fills its output in this order
+MONTHLY_KEYS = (
+    "gross", "pension", "medical", "unemployment", "housing_fund", "social_total",
+    "personal_housing", "company_housing", "housing_total", "tax", "net",
+)
+TOTAL_KEYS = (
+    "gross_annual", "social_personal_annual", "housing_personal_annual",
+    "housing_company_annual", "tax_annual", "net_annual",
+)
@@ -0,0 +1,169 @@
+"""numba-compiled cores of ``tax_calculator``, used when the Cython ``tax_calc`` module is not built.
+
+Imported lazily by ``tax_calculator`` on first use so that importing numba (and compiling, or
+loading the on-disk cache) only costs start-up time on the paths that need it. Raises
+ImportError when numba is missing or its JIT is disabled (``NUMBA_DISABLE_JIT=1``), so callers
+fall back to the pure-Python / NumPy code.
+"""
+
+from math import floor
+
+import numpy as np
+from numba import config, guvectorize, njit
+
+from tax_constants import (
+    MIN_BASE,
+    MAX_BASE,
+    SOCIAL_RATES,
+    HOUSING_FUND_RATE,
+    HOUSING_FUND_RATE_EMPLOYER,
+    STANDARD_DEDUCTION_MONTHLY,
+    MONTHLY_TAX_BRACKET_ARRAYS,
+    ANNUAL_TAX_BRACKET_ARRAYS,
+    MONTHLY_KEYS,
+    TOTAL_KEYS,
+)
+
+if config.DISABLE_JIT:
+    raise ImportError("numba JIT is disabled")
+
+# numba cannot read module-level dicts or tuples of tuples: scalar rates, the float64 bracket
+# arrays and the output shapes as plain globals instead
+_PENSION_RATE = SOCIAL_RATES['pension']
+_MEDICAL_RATE = SOCIAL_RATES['medical']
+_UNEMPLOYMENT_RATE = SOCIAL_RATES['unemployment']
+_M_LIMITS, _M_RATES, _M_QUICKS = MONTHLY_TAX_BRACKET_ARRAYS
+_A_LIMITS, _A_RATES, _A_QUICKS = ANNUAL_TAX_BRACKET_ARRAYS
+_N_MONTHLY = len(MONTHLY_KEYS)
+_N_TOTALS = len(TOTAL_KEYS)
+
+@njit(cache=True)
+def _rnd(value, to_int):
+    """Same rounding as ``tax_calculator._r``, written so numba can compile it."""
+    if to_int:
+        return floor(value + 0.5)
+    y = value * 100.0
+    r = floor(y + 0.5)
+    if r - y == 0.5:
+        # value * 100 landed exactly on a .5 tie; use the product's exact rounding error
+        # (Dekker split) to pick the side round(value, 2) would pick
+        c = 134217729.0 * value
+        hi = c - (c - value)
+        err = (hi * 100.0 - y) + (value - hi) * 100.0
+        if err < 0.0 or (err == 0.0 and r % 2.0 != 0.0):
+            r -= 1.0
+    return r / 100.0
+
+@njit(cache=True)
+def _annual_tax_core(taxable):
+    """Annual bracket tax for *taxable* income, rounded to 2 decimals."""
+    for i in range(len(_A_LIMITS)):
+        if taxable <= _A_LIMITS[i]:
+            return _rnd(taxable * _A_RATES[i] - _A_QUICKS[i], False)
+    return 0.0
+
+@njit(cache=True)
+def _yearly_core(gross_arr, round_int):
+    """Cumulative-withholding loop behind ``tax_calculator.yearly_salary_details``.
+
+    Returns a ``(len(MONTHLY_KEYS), len(gross_arr))`` array holding one row per output column
+    and a ``len(TOTAL_KEYS)`` totals array, both already rounded according to *round_int*.
+    Mirrors ``tax_calc._yearly_details_core``.
+    """
+    n = len(gross_arr)
+    monthly = np.empty((_N_MONTHLY, n), dtype=np.float64)
+    gross_out = monthly[0]
+    pension_out = monthly[1]
+    medical_out = monthly[2]
+    unemployment_out = monthly[3]
+    housing_fund_out = monthly[4]
+    social_total_out = monthly[5]
+    personal_housing_out = monthly[6]
+    company_housing_out = monthly[7]
+    housing_total_out = monthly[8]
+    tax_out = monthly[9]
+    net_out = monthly[10]
+    # running totals in TOTAL_KEYS order, accumulated month by month in the same order as the
+    # Cython core so both paths round the totals identically
+    totals = np.zeros(_N_TOTALS, dtype=np.float64)
+    cumulative_taxable = 0.0
+    cumulative_tax_paid = 0.0
+
+    for i in range(n):
+        gross = gross_arr[i]
+        base = MIN_BASE if gross < MIN_BASE else (MAX_BASE if gross > MAX_BASE else gross)
+        pension = _rnd(base * _PENSION_RATE, round_int)
+        medical = _rnd(base * _MEDICAL_RATE + 3, round_int)
+        unemployment = _rnd(base * _UNEMPLOYMENT_RATE, round_int)
+        personal_housing = _rnd(base * HOUSING_FUND_RATE, round_int)
+        company_housing = _rnd(base * HOUSING_FUND_RATE_EMPLOYER, round_int)
+        personal_social_total = pension + medical + unemployment + personal_housing
+
+        # cumulative taxable income up to this month
+        cumulative_taxable += gross - personal_social_total - STANDARD_DEDUCTION_MONTHLY
+        cumulative_tax = _annual_tax_core(max(0.0, cumulative_taxable))
+        month_tax = _rnd(max(0.0, cumulative_tax - cumulative_tax_paid), round_int)
+        cumulative_tax_paid += month_tax
+        net = _rnd(gross - personal_social_total - month_tax, round_int)
+
+        gross_out[i] = _rnd(gross, round_int)
+        pension_out[i] = pension
+        medical_out[i] = medical
+        unemployment_out[i] = unemployment
+        housing_fund_out[i] = personal_housing
+        social_total_out[i] = _rnd(personal_social_total, round_int)
+        personal_housing_out[i] = personal_housing
+        company_housing_out[i] = company_housing
+        housing_total_out[i] = _rnd(personal_housing + company_housing, round_int)
+        tax_out[i] = month_tax
+        net_out[i] = net
+
+        totals[0] += gross
+        totals[1] += personal_social_total
+        totals[2] += personal_housing
+        totals[3] += company_housing
+        totals[4] += month_tax
+        totals[5] += net
+
+    for k in range(len(totals)):
+        totals[k] = _rnd(totals[k], round_int)
+    return monthly, totals
+
+def _monthly_net_loop(gross, round_int, pension, medical, unemployment, housing, social_total, taxable, tax, net):
+    """Loop body of the gufunc behind ``tax_calculator.monthly_net_batch``, see :func:`_monthly_net_kernel`."""
+    for i in range(gross.shape[0]):
+        g = gross[i]
+        base = MIN_BASE if g < MIN_BASE else (MAX_BASE if g > MAX_BASE else g)
+        pension[i] = _rnd(base * _PENSION_RATE, round_int)
+        medical[i] = _rnd(base * _MEDICAL_RATE + 3, round_int)
+        unemployment[i] = _rnd(base * _UNEMPLOYMENT_RATE, round_int)
+        housing[i] = _rnd(base * HOUSING_FUND_RATE, round_int)
+        total = pension[i] + medical[i] + unemployment[i] + housing[i]
+        t = max(0.0, g - total - STANDARD_DEDUCTION_MONTHLY)
+        month_tax = 0.0
+        for k in range(len(_M_LIMITS)):
+            if t <= _M_LIMITS[k]:
+                month_tax = _rnd(_rnd(t * _M_RATES[k] - _M_QUICKS[k], False), round_int)
+                break
+        social_total[i] = total
+        taxable[i] = t
+        tax[i] = month_tax
+        net[i] = g - total - month_tax
+
+_monthly_net_gufunc = None
+
+def _monthly_net_kernel():
+    """Compile :func:`_monthly_net_loop` into a numba gufunc on first use and return it.
+
+    Built lazily and for ``target="cpu"``: a parallel gufunc compiled at import time keeps worker
+    threads around that hang interpreter exit when the module is imported off the main thread.
+    """
+    global _monthly_net_gufunc
+    if _monthly_net_gufunc is None:
+        _monthly_net_gufunc = guvectorize(
+            ["void(float64[:], boolean" + ", float64[:]" * 8 + ")"],
+            "(n),()->" + ",".join(["(n)"] * 8),
+            target="cpu",
+            cache=True,
+        )(_monthly_net_loop)
+    return _monthly_net_gufunc
@@ -0,0 +1,155 @@
+"""Consistency checks between the tax_calculator implementations.
+
+The same figures are produced by the Cython core (``tax_calc``), the numba core (``tax_numba``),
+the pure-Python loop and the NumPy batch code; these tests pin them to each other, to Python's
+``round()`` and to the published example figures. Run with ``python -m pytest``.
+"""
+import csv
+import os
+import random
+from math import floor
+
+import numpy as np
+import pytest
+
+import tax_calculator as tc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _values(seed, n=20000):
+    """Random amounts including many exact 3-decimal .5 ties and contribution-sized products."""
+    rng = random.Random(seed)
+    values = [rng.randrange(-10**7, 10**8) / 1000 for _ in range(n)]
+    values += [rng.uniform(0, 1e6) for _ in range(n)]
+    values += [rng.uniform(tc.MIN_BASE, tc.MAX_BASE) * rate for _ in range(n // 4)
+               for rate in (0.08, 0.02, 0.005, 0.07)]
+    return values
+
+
+def _expected_round(value, to_int):
+    return floor(value + 0.5) if to_int else round(value, 2)
+
+
+def _salary_years(seed, n=300):
+    """Random 1-12 month salary lists, with a share of exact-cent and uniform years."""
+    rng = random.Random(seed)
+    years = []
+    for _ in range(n):
+        months = [round(rng.uniform(0, 150000), rng.choice([0, 2])) for _ in range(rng.randint(1, 12))]
+        years.append(months if rng.random() < 0.8 else [months[0]] * 12)
+    return years
+
+
+def _rounders():
+    yield "python", tc._r
+    yield "numpy", lambda v, to_int: float(tc._round_vec(np.array([v]), to_int)[0])
+    try:
+        import tax_numba
+    except ImportError:
+        pass
+    else:
+        yield "numba", tax_numba._rnd
+    try:
+        import tax_calc
+    except ImportError:
+        pass
+    else:
+        yield "cython", tax_calc._r
+
+
+def _cores():
+    """Every available yearly core as ``f(gross_12, round_int) -> (rows, totals)`` on Python numbers."""
+    def compiled(core):
+        def run(gross, round_int):
+            columns, totals = core(np.array(gross, dtype=np.float64), round_int)
+            return list(zip(*columns.tolist())), totals.tolist()
+        return run
+
+    yield "python", tc._yearly_core_py
+    try:
+        import tax_numba
+    except ImportError:
+        pass
+    else:
+        yield "numba", compiled(tax_numba._yearly_core)
+    try:
+        import tax_calc
+    except ImportError:
+        pass
+    else:
+        yield "cython", compiled(tax_calc._yearly_details_core)
+
+
+@pytest.mark.parametrize("to_int", [False, True])
+def test_rounders_match_round(to_int):
+    values = _values(1)
+    expected = [_expected_round(v, to_int) for v in values]
+    assert tc._round_vec(np.array(values), to_int).tolist() == expected
+    for name, rounder in _rounders():
+        mismatches = [v for v, e in zip(values, expected) if rounder(v, to_int) != e]
+        assert not mismatches, (name, mismatches[:5])
+
+
+@pytest.mark.parametrize("round_int", [False, True])
+def test_yearly_cores_agree(round_int):
+    cores = dict(_cores())
+    for gross in _salary_years(2):
+        padded = (gross + [0.0] * 12)[:12]
+        reference = cores["python"](padded, round_int)
+        for name, core in cores.items():
+            assert core(padded, round_int) == reference, (name, gross)
+
+
+@pytest.mark.parametrize("round_int", [False, True])
+def test_yearly_result_forms_agree(round_int):
+    for gross in _salary_years(3, n=20):
+        as_dict = tc.yearly_salary_details(gross, round_int)
+        as_frame = tc.yearly_salary_details(gross, round_int, as_dict=False)
+        assert as_frame["totals"] == as_dict["totals"]
+        assert as_frame["monthly"].to_dict("records") == as_dict["monthly"]
+
+
+@pytest.mark.parametrize("round_int", [False, True])
+def test_monthly_net_batch_matches_monthly_net(round_int):
+    rng = random.Random(4)
+    gross = [0, 2690, 5000, 8123.45, 36921] + [round(rng.uniform(0, 200000), 2) for _ in range(5000)]
+    batch = tc.monthly_net_batch(gross, round_int)
+    assert len(batch) == len(gross)
+    for row, g in zip(batch.to_dict("records"), gross):
+        expected = tc.monthly_net(g, round_int)
+        assert {k: row[k] for k in expected} == expected, g
+    (scalar,) = tc.monthly_net_batch(8000.0, round_int).to_dict("records")
+    assert scalar["net"] == tc.monthly_net(8000.0, round_int)["net"]
+
+
+def test_round_int_accepts_any_truthy_value():
+    assert tc.monthly_net(40000, 2) == tc.monthly_net(40000, True)
+    assert tc.annual_net(480000, 2) == tc.annual_net(480000, True)
+    assert tc.monthly_net_batch([40000, 5000], 2).equals(tc.monthly_net_batch([40000, 5000], True))
+
+
+def test_notebook_example_figures():
+    monthly = tc.monthly_net(40000, round_int=True)
+    assert (monthly["social_total"], monthly["tax"], monthly["net"]) == (6464, 4474, 29062)
+
+    annual = tc.annual_net(480000, round_int=True)
+    assert (annual["social_total_annual"], annual["taxable_annual"], annual["tax_annual"]) == (77568, 342432, 53688)
+    assert annual["net_annual"] == 348744
+
+    totals = tc.yearly_salary_details([40000] * 12, round_int=True)["totals"]
+    assert totals == {
+        "gross_annual": 480000, "social_personal_annual": 77568, "housing_personal_annual": 31008,
+        "housing_company_annual": 31008, "tax_annual": 53688, "net_annual": 348744,
+    }
+
+
+def test_sample_csv_is_reproduced():
+    """output_csv/salary_2024_* is the CLI output of ``details 40000 --csv``."""
+    result = tc.yearly_salary_details([40000.0] * 12)
+    with open(os.path.join(HERE, "output_csv", "salary_2024_monthly.csv"), encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [{k: float(v) for k, v in row.items()} for row in rows] == result["monthly"]
+    with open(os.path.join(HERE, "output_csv", "salary_2024_totals.csv"), encoding="utf-8") as f:
+        (totals,) = csv.DictReader(f)
+    assert {k: float(v) for k, v in totals.items()} == result["totals"]